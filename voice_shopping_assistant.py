@@ -10,14 +10,20 @@
 # ✔ No cart logic
 # ✔ Just clean voice → shopping results
 
+import mmap
 import os
-import json
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import sounddevice as sd
 from vosk import Model, KaldiRecognizer
+from dataclasses import dataclass
 from dotenv import load_dotenv
 import platform
+import queue
 import subprocess
+import time
 
 # ---------------- ENV ----------------
 load_dotenv()
@@ -26,20 +32,40 @@ SERPAPI_KEY = os.getenv("SERP_API_KEY")
 if not SERPAPI_KEY:
     raise RuntimeError("SERP_API_KEY missing in .env file")
 
+# ---------------- HTTP ----------------
+# One shared session so repeat searches reuse the same TCP/TLS connection
+# (keep-alive) instead of paying a fresh handshake to serpapi.com every time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
 # ---------------- TTS ----------------
+# One long-lived say/espeak process fed lines over stdin, instead of a fork
+# plus exec per utterance. Both tools speak each stdin line as it arrives,
+# and writing to the pipe doesn't block, so the loop keeps running while
+# audio plays.
+tts_proc = None
+
+
 def speak(text: str):
+    global tts_proc
     print("🔊", text)
     try:
         system = platform.system()
-        if system == "Darwin":
-            subprocess.run(["say", text])
-        elif system == "Windows":
+        if system == "Windows":
             import pyttsx3
             engine = pyttsx3.init()
             engine.say(text)
             engine.runAndWait()
         else:
-            subprocess.run(["espeak", text])
+            if tts_proc is None or tts_proc.poll() is not None:
+                cmd = ["say"] if system == "Darwin" else ["espeak"]
+                tts_proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            tts_proc.stdin.write((text + "\n").encode())
+            tts_proc.stdin.flush()
     except:
         pass
 
@@ -51,61 +77,158 @@ MODEL_PATH = "model"
 if not os.path.exists(MODEL_PATH):
     raise RuntimeError("Vosk model folder missing. Place model inside ./model")
 
+
+def prewarm_model_files(path):
+    # Ask the kernel to start reading the model files into page cache before
+    # the Vosk loader touches them, so startup isn't bottlenecked on cold
+    # sequential reads. Best effort, POSIX only.
+    if not hasattr(mmap, "MADV_WILLNEED"):
+        return
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                with open(os.path.join(root, name), "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+                    mm.madvise(mmap.MADV_WILLNEED)
+                    mm.close()
+            except (OSError, ValueError):
+                continue
+
+
+prewarm_model_files(MODEL_PATH)
 vosk_model = Model(MODEL_PATH)
 
+SAMPLERATE = 16000
+BLOCKSIZE = 8000          # frames per callback (~0.5s of audio)
+SILENCE_THRESHOLD = 500   # int16 peak below this counts as silence
+SILENCE_BLOCKS = 3        # silent blocks after speech = user stopped talking
+MAX_BLOCKS = 20           # hard cap (~10s) so we never listen forever
+
+audio_queue = queue.Queue()
 
-def listen_once(seconds=4):
-    samplerate = 16000
-    rec = KaldiRecognizer(vosk_model, samplerate)
+# Building a KaldiRecognizer is expensive (it allocates the full decoder);
+# build it once and Reset() between utterances instead of rebuilding per call.
+recognizer = KaldiRecognizer(vosk_model, SAMPLERATE)
+
+
+def audio_callback(indata, frames, time_info, status):
+    data = bytes(indata)
+    # Peak level of the block; np.frombuffer is a zero-copy view, so this is
+    # one vectorized pass — far cheaper than asking Vosk whether it heard
+    # anything.
+    peak = int(np.abs(np.frombuffer(data, dtype=np.int16)).max())
+    audio_queue.put((data, peak))
+
+
+def listen_once():
+    rec = recognizer
+    rec.Reset()
+
+    # Drop any stale audio in one shot under the queue's own lock instead of
+    # racing the callback with a get() loop.
+    with audio_queue.mutex:
+        audio_queue.queue.clear()
+        audio_queue.unfinished_tasks = 0
+        audio_queue.all_tasks_done.notify_all()
 
     print("🎤 Listening...")
-    recording = sd.rec(int(seconds * samplerate), samplerate=samplerate, channels=1, dtype="int16")
-    sd.wait()
 
-    audio_bytes = recording.tobytes()
+    text = ""
+    has_speech = False
+    silent_blocks = 0
+
+    with sd.RawInputStream(samplerate=SAMPLERATE, blocksize=BLOCKSIZE,
+                           dtype="int16", channels=1, callback=audio_callback):
+        for _ in range(MAX_BLOCKS):
+            data, peak = audio_queue.get()
 
-    if rec.AcceptWaveform(audio_bytes):
-        result = json.loads(rec.Result())
-    else:
-        result = json.loads(rec.FinalResult())
+            if peak < SILENCE_THRESHOLD:
+                # Silent block: no point running the decoder on it.
+                if has_speech:
+                    silent_blocks += 1
+                    if silent_blocks >= SILENCE_BLOCKS:
+                        break
+                continue
 
-    text = result.get("text", "").strip().lower()
+            has_speech = True
+            silent_blocks = 0
+
+            if rec.AcceptWaveform(data):
+                text = orjson.loads(rec.Result()).get("text", "")
+                if text:
+                    break
+
+    if not text:
+        text = orjson.loads(rec.FinalResult()).get("text", "")
+
+    text = text.strip().lower()
 
     print("🗣 You said:", text)
     return text
 
 # ---------------- SERP (GOOGLE SHOPPING ONLY) ----------------
+@dataclass(slots=True)
+class Product:
+    rank: int
+    title: str
+    price: str
+    link: str
+
+
+
+# Repeat queries are common with voice input ("wireless headphones" again),
+# so cache results for a while instead of paying a SerpAPI round trip each
+# time. TTL keeps prices from going stale.
+CACHE_TTL = 600  # seconds
+CACHE_MAX = 128
+_search_cache = {}
+
+SERP_URL = "https://serpapi.com/search.json"
+SERP_PARAMS = {
+    "api_key": SERPAPI_KEY,
+    "engine": "google_shopping",
+    "hl": "en",
+    "gl": "in"
+}
+
+
 def search_products(query):
-    url = "https://serpapi.com/search.json"
+    query = " ".join(query.split()).strip().lower()
 
-    params = {
-        "q": query,
-        "api_key": SERPAPI_KEY,
-        "engine": "google_shopping",
-        "hl": "en",
-        "gl": "in"
-    }
+    cached = _search_cache.get(query)
+    if cached and time.time() < cached[0]:
+        print("🛍 Searching (cached):", query)
+        return cached[1]
 
     print("🛍 Searching:", query)
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    response = SESSION.get(SERP_URL, params={**SERP_PARAMS, "q": query}, timeout=10)
+    data = orjson.loads(response.content)
 
     results = []
 
-    for item in data.get("shopping_results", [])[:5]:
-        results.append({
-            "title": item.get("title"),
-            "price": item.get("price"),
-            "link": item.get("link")
-        })
+    for rank, item in enumerate(data.get("shopping_results", [])[:5], start=1):
+        results.append(Product(
+            rank=rank,
+            title=item.get("title"),
+            price=item.get("price"),
+            link=item.get("link")
+        ))
+
+    if results:
+        if len(_search_cache) >= CACHE_MAX:
+            _search_cache.pop(next(iter(_search_cache)))
+        _search_cache[query] = (time.time() + CACHE_TTL, results)
 
     return results
 
 # ---------------- MAIN LOOP ----------------
+# O(1) membership per token instead of a substring scan per exit word.
+EXIT_WORDS = frozenset({"exit", "quit", "goodbye", "bye"})
+
 print("🎙 Voice Shopping Search Assistant")
 print("Say something like: wireless headphones")
-print("Ctrl+C to exit\n")
+print("Say 'exit' or Ctrl+C to quit\n")
 
 while True:
     try:
@@ -114,6 +237,11 @@ while True:
         if not query:
             continue
 
+        if not EXIT_WORDS.isdisjoint(query.split()):
+            speak("Goodbye")
+            print("\nGoodbye 👋")
+            break
+
         results = search_products(query)
 
         if not results:
@@ -122,11 +250,14 @@ while True:
 
         speak("Here are the top results")
 
-        print("\nResults:")
-        for i, item in enumerate(results):
-            print(f"[{i}] {item['title']}")
-            print(f"     💰 {item.get('price', 'N/A')}")
-            print(f"     🔗 {item['link']}\n")
+        lines = ["\nResults:"]
+        lines.extend(
+            f"[{item.rank}] {item.title}\n"
+            f"     💰 {item.price or 'N/A'}\n"
+            f"     🔗 {item.link}\n"
+            for item in results
+        )
+        print("\n".join(lines))
 
     except KeyboardInterrupt:
         print("\nGoodbye 👋")